@@ -1,13 +1,22 @@
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import logging
 import os
+import sys
 import datetime
+import re
+import atexit
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from apscheduler.schedulers.blocking import BlockingScheduler
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-import json
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 
 # Configure logging
 logging.basicConfig(
@@ -22,8 +31,23 @@ logger = logging.getLogger(__name__)
 
 # Configuration
 URL = "https://shop.royalchallengers.com/ticket"
-ALERT_MESSAGE = "🎉 RCB TICKETS ARE NOW AVAILABLE! 🎉 Go to: https://shop.royalchallengers.com/ticket"
+URLS = [URL]  # Ticket pages to monitor, e.g. add per-match pages here
+MAX_PARALLEL_CHECKS = 4  # Maximum number of pages (and browsers) checked at once
+ALERT_MESSAGE = "🎉 RCB TICKETS ARE NOW AVAILABLE! 🎉 Go to: {urls}"  # Filled with the pages that went on sale
+PAGERDUTY_EVENTS_HOST = "https://events.pagerduty.com"
+CHECK_INTERVAL_SECONDS = int(os.environ.get("CHECK_INTERVAL_SECONDS", "60"))  # Polling interval when running as a daemon
+ALERT_TIMEOUT = (3, 5)  # (connect, read) timeout in seconds for alert requests
 EXPECTED_COMING_SOON_COUNT = 7  # Expected number of "COMING SOON" elements when no tickets are available
+DEBUG = "--debug" in sys.argv or os.environ.get("RCB_DEBUG", "").strip().lower() in ("1", "true", "yes")  # Save screenshot and page HTML on every check
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")  # Explicit chromedriver binary; skips Selenium Manager discovery
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+BUY_TICKETS_PATTERN = re.compile(r"\b(BUY|GET)\s+TICKETS?\b", re.IGNORECASE)
+COMING_SOON_PATTERN = re.compile(r"\bCOMING\s+SOON\b", re.IGNORECASE)
+PAGE_TEXT_SCRIPT = "return document.body ? document.body.innerText : ''"
+PAGE_STATE_SCRIPT = "return [document.readyState, document.body ? document.body.innerText : '']"
+RENDER_TIMEOUT = 30  # Maximum seconds to wait for the ticket widget to render
+RENDER_POLL_INTERVAL = 1  # Seconds between checks of the rendered page text
+RENDER_STABLE_POLLS = 2  # Consecutive unchanged polls after which the page counts as rendered
 
 # Get secrets from environment variables
 SLACK_WEBHOOK = os.environ.get("SLACK_WEBHOOK")
@@ -36,32 +60,51 @@ if not PAGERDUTY_ROUTING_KEY:
     logger.error("PAGERDUTY_ROUTING_KEY environment variable is not set")
     raise ValueError("PAGERDUTY_ROUTING_KEY environment variable must be set")
 
-def send_pagerduty_event():
+# Shared HTTP session so alert requests reuse pooled keep-alive connections
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Pool of idle browser instances, reused across checks and closed at interpreter exit
+_idle_drivers = queue.Queue()
+_all_drivers = []
+_drivers_lock = threading.Lock()
+
+def send_pagerduty_event(available_urls):
     """
     Send an alert to PagerDuty using the Events API
+    
+    Args:
+        available_urls (list): The ticket pages showing tickets on sale
     """
-    url = "https://events.pagerduty.com/v2/enqueue"
+    url = f"{PAGERDUTY_EVENTS_HOST}/v2/enqueue"
     
     payload = {
         "routing_key": PAGERDUTY_ROUTING_KEY,
         "event_action": "trigger",
         "payload": {
-            "summary": "RCB Tickets now available: shop.royalchallengers.com/ticket",
+            "summary": f"RCB Tickets now available: {', '.join(available_urls)}",
             "source": "Python Automation",
             "severity": "error"
         }
     }
     
     try:
-        response = requests.post(url, json=payload)
+        response = _session.post(url, json=payload, timeout=ALERT_TIMEOUT)
         response.raise_for_status()
-        logger.info(f"Success! Alert sent to PagerDuty. Status code: {response.status_code}")
-        logger.info(f"Response: {response.json()}")
+        logger.info("Success! Alert sent to PagerDuty. Status code: %d", response.status_code)
+        logger.info("Response: %s", response.json())
         return True
+    except requests.exceptions.Timeout as e:
+        logger.error("Timed out sending alert to PagerDuty: %s", e)
+        return False
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error sending alert to PagerDuty: {e}")
+        logger.error("Error sending alert to PagerDuty: %s", e)
         if hasattr(e, 'response') and e.response is not None:
-            logger.error(f"Response: {e.response.text}")
+            logger.error("Response: %s", e.response.text)
         return False
 
 def send_slack_message(webhook_url, message):
@@ -80,147 +123,361 @@ def send_slack_message(webhook_url, message):
         "text": message
     }
     
-    # Convert the payload to JSON
-    payload_json = json.dumps(payload)
-    
-    # Set the headers
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
     try:
-        # Send the POST request
-        response = requests.post(webhook_url, data=payload_json, headers=headers)
+        # Send the POST request; requests serializes the payload and sets the JSON Content-Type
+        response = _session.post(webhook_url, json=payload, timeout=ALERT_TIMEOUT)
         
         # Check if the request was successful
         if response.status_code == 200 and response.text == "ok":
             logger.info("Slack message sent successfully!")
             return True
         else:
-            logger.error(f"Failed to send Slack message. Status code: {response.status_code}")
-            logger.error(f"Response: {response.text}")
+            logger.error("Failed to send Slack message. Status code: %d", response.status_code)
+            logger.error("Response: %s", response.text)
             return False
+    except requests.exceptions.Timeout as e:
+        logger.error("Timed out sending Slack message: %s", e)
+        return False
     except Exception as e:
-        logger.error(f"Unexpected error sending Slack message: {str(e)}")
+        logger.error("Unexpected error sending Slack message: %s", e)
         return False
 
+def check_alert_sinks_reachable():
+    """
+    Cheaply check that PagerDuty and Slack can be reached before doing any browser work.
+    
+    Any HTTP response counts as reachable; only DNS/connection failures and timeouts do not.
+    
+    Returns:
+        bool: True if at least one alert destination is reachable, False otherwise
+    """
+    sinks = {
+        "PagerDuty": PAGERDUTY_EVENTS_HOST,
+        "Slack": SLACK_WEBHOOK.rsplit("/", 3)[0]
+    }
+    reachable = False
+    for name, url in sinks.items():
+        try:
+            # Plain request without the retrying session: any response counts, and this must stay cheap
+            requests.head(url, timeout=2)
+            reachable = True
+        except requests.exceptions.RequestException as e:
+            logger.error("%s is unreachable: %s", name, e)
+    return reachable
+
 def setup_selenium():
     """Set up and return a headless Chrome browser instance."""
     chrome_options = Options()
-    chrome_options.add_argument("--headless")
+    # New headless mode (Chrome 109+); older builds ignore the value and fall back to legacy headless
+    chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    # A small viewport is enough to render the ticket text and keeps the framebuffer small
+    chrome_options.add_argument("--window-size=1024,768")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+    
+    # Only the page text matters, so skip downloading images and fonts. Stylesheets are
+    # still loaded: innerText relies on them to leave out hidden menus and templates.
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2
+    })
+    # Return from driver.get() at DOMContentLoaded; the explicit wait covers rendering
+    chrome_options.page_load_strategy = "eager"
     
     try:
-        driver = webdriver.Chrome(options=chrome_options)
+        if CHROMEDRIVER_PATH:
+            service = Service(executable_path=CHROMEDRIVER_PATH)
+        else:
+            service = Service()  # Let Selenium Manager locate chromedriver
+        driver = webdriver.Chrome(service=service, options=chrome_options)
         return driver
     except Exception as e:
-        logger.error(f"Error setting up Selenium: {e}")
+        logger.error("Error setting up Selenium: %s", e)
         raise
 
-def check_ticket_availability():
-    """Check ticket availability using Selenium to load dynamic content."""
-    driver = None
+def acquire_driver():
+    """Take an idle Chrome browser from the pool, starting a new one if none is free."""
     try:
-        logger.info("Starting Selenium browser to check ticket availability")
+        return _idle_drivers.get_nowait()
+    except queue.Empty:
+        logger.info("Starting Selenium browser")
         driver = setup_selenium()
-        
-        # Load the page
-        driver.get(URL)
-        
-        # Wait for the page to fully load
-        time.sleep(30)  # Allow JavaScript to render content
-        
-        # Take a screenshot for debugging
+        with _drivers_lock:
+            _all_drivers.append(driver)
+        return driver
+
+def release_driver(driver):
+    """Return a browser to the pool so a later check can reuse it."""
+    _idle_drivers.put(driver)
+
+def discard_driver(driver):
+    """Close a browser and remove it from the pool."""
+    with _drivers_lock:
+        if driver in _all_drivers:
+            _all_drivers.remove(driver)
+    try:
+        driver.quit()
+        logger.info("Selenium browser closed")
+    except:
+        pass
+
+def quit_drivers():
+    """Close every browser started by the pool."""
+    with _drivers_lock:
+        drivers = list(_all_drivers)
+    for driver in drivers:
+        discard_driver(driver)
+
+atexit.register(quit_drivers)
+
+def save_debug_artifacts(driver, page_source=None):
+    """
+    Save a screenshot and the rendered HTML of the current page for inspection.
+    
+    Args:
+        driver: The Selenium WebDriver showing the page
+        page_source (str, optional): Already fetched page HTML, read from the driver if omitted
+    """
+    try:
         driver.save_screenshot("latest_screenshot.png")
         logger.info("Saved screenshot for inspection")
         
-        # Get the page source after JavaScript has executed
-        page_source = driver.page_source
-        
-        # Save the dynamically generated HTML for inspection
+        if page_source is None:
+            page_source = driver.page_source
         with open("latest_dynamic_page.html", "w", encoding="utf-8") as f:
             f.write(page_source)
         logger.info("Saved dynamic page HTML for inspection")
+    except Exception as e:
+        logger.error("Error saving debug artifacts: %s", e)
+
+class _TicketWidgetRendered:
+    """
+    Wait condition for the ticket widget having finished rendering.
+    
+    The page counts as rendered once it has loaded and its text has stopped changing
+    for a few polls. A BUY TICKETS label or the full set of COMING SOON placeholders
+    ends the wait early.
+    """
+    
+    def __init__(self):
+        self.last_text = None
+        self.stable_polls = 0
+    
+    def __call__(self, driver):
+        """
+        Returns:
+            str or bool: The rendered page text once complete, False to keep waiting
+        """
+        ready_state, page_text = driver.execute_script(PAGE_STATE_SCRIPT)
+        page_text = page_text or ""
         
-        # First check for "BUY TICKETS" or "GET TICKETS" directly in the page
-        buy_tickets_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'BUY TICKETS') or contains(text(), 'Buy Tickets') or contains(text(), 'Get Tickets')]")
+        if BUY_TICKETS_PATTERN.search(page_text):
+            return page_text
+        if len(COMING_SOON_PATTERN.findall(page_text)) >= EXPECTED_COMING_SOON_COUNT:
+            return page_text
         
-        # Look for "COMING SOON" elements
-        coming_soon_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'COMING SOON') or contains(text(), 'Coming Soon')]")
+        if ready_state == "complete" and page_text and page_text == self.last_text:
+            self.stable_polls += 1
+        else:
+            self.stable_polls = 0
+        self.last_text = page_text
         
-        logger.info(f"Found {len(buy_tickets_elements)} 'BUY TICKETS' elements on the page")
-        logger.info(f"Found {len(coming_soon_elements)} 'COMING SOON' elements on the page")
+        if self.stable_polls >= RENDER_STABLE_POLLS:
+            return page_text
+        return False
+
+def check_ticket_availability(url=URL):
+    """Check ticket availability using Selenium to load dynamic content."""
+    driver = None
+    try:
+        logger.info("Using Selenium browser to check %s", url)
+        driver = acquire_driver()
+        
+        # Start from a clean session so state from earlier checks does not leak in
+        driver.delete_all_cookies()
         
-        # IMPROVED LOGIC: Alert if we find any "BUY TICKETS" element
-        if len(buy_tickets_elements) > 0:
-            logger.info("TICKETS ARE AVAILABLE NOW! Found 'BUY TICKETS' elements.")
+        # Load the page
+        driver.get(url)
+        
+        # Wait until JavaScript has rendered the ticket widget; the condition returns the page text
+        try:
+            page_text = WebDriverWait(driver, RENDER_TIMEOUT, poll_frequency=RENDER_POLL_INTERVAL).until(
+                _TicketWidgetRendered()
+            )
+            # Screenshot and HTML dumps are only needed when debugging
+            if DEBUG:
+                save_debug_artifacts(driver)
+        except TimeoutException:
+            logger.warning("Timed out waiting for ticket content to render, checking page as-is")
+            # Always keep a snapshot of a page that never finished rendering
+            save_debug_artifacts(driver)
+            page_text = driver.execute_script(PAGE_TEXT_SCRIPT) or ""
+        
+        buy_tickets_count = len(BUY_TICKETS_PATTERN.findall(page_text))
+        coming_soon_count = len(COMING_SOON_PATTERN.findall(page_text))
+        
+        logger.info("Found %d 'BUY TICKETS' matches on the page", buy_tickets_count)
+        logger.info("Found %d 'COMING SOON' matches on the page", coming_soon_count)
+        
+        # IMPROVED LOGIC: Alert if we find any "BUY TICKETS" text
+        if buy_tickets_count > 0:
+            logger.info("TICKETS ARE AVAILABLE NOW! Found 'BUY TICKETS' text.")
             return True
             
-        # # IMPROVED LOGIC: Alert if the number of "COMING SOON" elements is less than expected
-        # if len(coming_soon_elements) < EXPECTED_COMING_SOON_COUNT:
-        #     logger.info(f"POTENTIAL TICKET AVAILABILITY! Found only {len(coming_soon_elements)} 'COMING SOON' elements (expected {EXPECTED_COMING_SOON_COUNT}).")
+        # # IMPROVED LOGIC: Alert if the number of "COMING SOON" matches is less than expected
+        # if coming_soon_count < EXPECTED_COMING_SOON_COUNT:
+        #     logger.info("POTENTIAL TICKET AVAILABILITY! Found only %d 'COMING SOON' matches (expected %d).", coming_soon_count, EXPECTED_COMING_SOON_COUNT)
         #     return True
-            
-        # Additional check for button elements
-        buttons = driver.find_elements(By.TAG_NAME, "button")
-        logger.info(f"Found {len(buttons)} button elements")
-        for i, button in enumerate(buttons[:5]):  # Log first 5 buttons only
-            button_text = button.text.upper()
-            logger.info(f"Button {i+1}: '{button_text}'")
-            if ("BUY" in button_text or "GET" in button_text) and "TICKET" in button_text:
-                logger.info("TICKETS ARE AVAILABLE NOW! Found button with ticket purchase text.")
-                return True
         
         # No ticket availability detected
         logger.info("Tickets not available yet - all checks indicate tickets are not on sale")
         return False
         
     except Exception as e:
-        logger.error(f"Error during selenium check: {str(e)}")
+        logger.error("Error during selenium check: %s", e)
+        # Always keep a snapshot of the failing page for post-mortem
+        if driver:
+            save_debug_artifacts(driver)
+        # Discard the browser in case it is wedged; the next check starts a fresh one
+        if driver:
+            discard_driver(driver)
+            driver = None
         return False
     finally:
         if driver:
+            release_driver(driver)
+
+def check_all_ticket_pages(urls=URLS):
+    """
+    Check every monitored ticket page in parallel.
+    
+    Args:
+        urls (list): The ticket pages to check
+        
+    Returns:
+        list: The page found showing tickets available, returned as soon as one
+        is found, or an empty list if none are
+    """
+    if not urls:
+        logger.error("No ticket pages configured to check")
+        return []
+    
+    executor = ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CHECKS, len(urls)))
+    try:
+        futures = {executor.submit(check_ticket_availability, url): url for url in urls}
+        for future in as_completed(futures):
             try:
-                driver.quit()
-                logger.info("Selenium browser closed")
-            except:
-                pass
+                tickets_available = future.result()
+            except Exception as e:
+                logger.error("Error checking %s: %s", futures[future], e)
+                tickets_available = False
+            if tickets_available:
+                # Drop checks that have not started yet; running ones finish in the background
+                for pending in futures:
+                    pending.cancel()
+                return [futures[future]]
+        return []
+    finally:
+        # Don't hold up the alert waiting for the remaining pages
+        executor.shutdown(wait=False)
+
+def send_alerts(available_urls):
+    """
+    Send both PagerDuty and Slack alerts, in parallel, for redundancy.
+    
+    Args:
+        available_urls (list): The ticket pages showing tickets on sale
+        
+    Returns:
+        bool: True if at least one alert was sent successfully, False otherwise
+    """
+    message = ALERT_MESSAGE.format(urls=" ".join(available_urls))
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pagerduty_future = executor.submit(send_pagerduty_event, available_urls)
+        slack_future = executor.submit(send_slack_message, SLACK_WEBHOOK, message)
+        pagerduty_sent = pagerduty_future.result()
+        slack_sent = slack_future.result()
+    
+    # Consider alert sent if at least one notification method worked
+    alert_sent = pagerduty_sent or slack_sent
+    
+    if alert_sent:
+        logger.info("At least one alert sent successfully!")
+    else:
+        logger.error("Failed to send any alerts")
+    return alert_sent
+
+def run_check():
+    """
+    Check all ticket pages once and send alerts if tickets are available.
+    
+    Returns:
+        bool or None: True if tickets are available and an alert was delivered,
+        False if tickets are not available yet, None if no alert could be
+        delivered (destinations unreachable or every alert failed)
+    """
+    # Fail fast if no alert could be delivered anyway
+    if not check_alert_sinks_reachable():
+        logger.error("No alert destination is reachable, skipping ticket check")
+        return None
+    
+    available_urls = check_all_ticket_pages()
+    if available_urls:
+        logger.info("Tickets are now available at %s! Sending alerts...", ", ".join(available_urls))
+        return True if send_alerts(available_urls) else None
+    
+    logger.info("Tickets not available yet.")
+    return False
 
 def main():
     """Main function to check ticket availability once (for GitHub Actions)."""
     logger.info("Starting RCB ticket availability monitor")
     
-    tickets_available = check_ticket_availability()
+    return 1 if run_check() is None else 0
+
+def run_monitor(interval=CHECK_INTERVAL_SECONDS):
+    """
+    Check ticket availability every `interval` seconds in a long-running process.
     
-    if tickets_available:
-        logger.info("Tickets are now available! Sending alerts...")
-        
-        # Send both PagerDuty and Slack alerts for redundancy
-        pagerduty_sent = send_pagerduty_event()
-        slack_sent = send_slack_message(SLACK_WEBHOOK, ALERT_MESSAGE)
-        
-        # Consider alert sent if at least one notification method worked
-        alert_sent = pagerduty_sent or slack_sent
-        
-        if alert_sent:
-            logger.info("At least one alert sent successfully!")
-            return 0
-        else:
-            logger.error("Failed to send any alerts")
-            return 1
-    else:
-        logger.info("Tickets not available yet.")
-        return 0
+    The browser and HTTP sessions are reused between checks, and the monitor
+    stops once an alert has been delivered.
+    
+    Args:
+        interval (int): Seconds between checks
+    """
+    scheduler = BlockingScheduler()
+    
+    def scheduled_check():
+        if run_check():
+            logger.info("Alerts delivered, stopping monitor")
+            scheduler.shutdown(wait=False)
+    
+    # Run the first check immediately; skip runs that would overlap a slow check
+    scheduler.add_job(
+        scheduled_check,
+        "interval",
+        seconds=interval,
+        next_run_time=datetime.datetime.now(),
+        max_instances=1,
+        coalesce=True
+    )
+    
+    logger.info("Starting RCB ticket availability monitor, checking every %d seconds", interval)
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Monitor stopped")
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1 and sys.argv[1] == "--debug":
-        check_ticket_availability()
+        check_all_ticket_pages()
         logger.info("Debug analysis complete. Check the log, latest_screenshot.png, and latest_dynamic_page.html for details.")
-    else:
+    elif len(sys.argv) > 1 and sys.argv[1] == "--once":
         exit_code = main()
         exit(exit_code)
+    else:
+        run_monitor()